@@ -5,13 +5,17 @@
 ############################################################
 # ライブラリの読み込み
 ############################################################
-from langchain_community.document_loaders import PyMuPDFLoader, Docx2txtLoader, TextLoader
-from langchain_community.document_loaders.csv_loader import CSVLoader
-
 import re
 import os
+import io
+import sys
 import csv
-from typing import List, Dict, Any, Optional
+import codecs
+import unicodedata
+from collections import defaultdict
+from functools import lru_cache
+from importlib import import_module
+from typing import List, Dict, Any, Iterator, Optional, Tuple
 
 try:
     from langchain_core.documents import Document
@@ -25,17 +29,52 @@ except Exception:  # pragma: no cover
             Document = None  # type: ignore
 
 
+@lru_cache(maxsize=None)
+def _document_loader(module_name: str, class_name: str):
+    # 各ローダーが依存するライブラリ（pymupdf・docx2txt など）は、実際に使うローダーだけ初回利用時に import する
+    return getattr(import_module(module_name), class_name)
+
+
+def _community_loader(class_name: str):
+    return _document_loader("langchain_community.document_loaders", class_name)
+
+
+def _csv_loader(path: str, encoding: str):
+    return _document_loader("langchain_community.document_loaders.csv_loader", "CSVLoader")(path, encoding=encoding)
+
+
+def _nfkc(s: str) -> str:
+    # ASCII のみの文字列は NFKC で変化しないため、正規化テーブルの走査を省略する
+    return s if s.isascii() else unicodedata.normalize("NFKC", s)
+
+
+# 列名の正規化で除去する文字（空白・アンダースコア・ハイフン・全角スペース）
+_NORM_RE = re.compile(r"[\s_\-　]+")
+# ASCII のみの列名向けに、正規表現を使わず同じ文字を除去する変換テーブル
+_NORM_TRANS = str.maketrans("", "", " \t\n\r\f\v\x1c\x1d\x1e\x1f_-")
+
+
+@lru_cache(maxsize=1024)
 def _normalize_key(s: str) -> str:
-    return re.sub(r"[\s_\-　]+", "", str(s)).lower()
+    s = _nfkc(str(s))
+    if s.isascii():
+        return s.translate(_NORM_TRANS).lower()
+    return _NORM_RE.sub("", s).lower()
+
 
+@lru_cache(maxsize=64)
+def _normalize_candidates(candidates: Tuple[str, ...]) -> Tuple[str, ...]:
+    return tuple(_normalize_key(c) for c in candidates)
 
-def _pick_column(fieldnames: List[str], candidates: List[str]) -> Optional[str]:
-    if not fieldnames:
+
+def _pick_column(norm_map: Dict[str, str], candidates: List[str]) -> Optional[str]:
+    """
+    norm_map: 列名 -> 正規化済み列名（呼び出し側で 1 度だけ作成し、複数の列推定で共有する）
+    """
+    if not norm_map:
         return None
-    norm_map = {fn: _normalize_key(fn) for fn in fieldnames}
-    cand_norm = [_normalize_key(c) for c in candidates]
     # exact/contains match in priority order
-    for c in cand_norm:
+    for c in _normalize_candidates(tuple(candidates)):
         for fn, n in norm_map.items():
             if n == c:
                 return fn
@@ -45,28 +84,69 @@ def _pick_column(fieldnames: List[str], candidates: List[str]) -> Optional[str]:
     return None
 
 
-def _read_csv_rows(file_path: str, encodings: List[str]) -> tuple[List[str], List[Dict[str, str]], str]:
+@lru_cache(maxsize=64)
+def _resolve_keys(fieldnames: Tuple[str, ...]) -> Tuple[Optional[str], Optional[str], Optional[str], Optional[str]]:
+    """
+    ヘッダーから (部署, 氏名, 社員ID, 役職) の列名を推定する。
+    同じヘッダー構成の CSV を再読み込みした場合は推定結果を再利用する。
+    """
+    norm_map = {fn: _normalize_key(fn) for fn in fieldnames}
+    dept_key = _pick_column(norm_map, ["所属部署", "部署", "部門", "所属", "department", "dept", "section", "team"])
+    name_key = _pick_column(norm_map, ["氏名", "名前", "社員名", "name", "fullname"])
+    id_key = _pick_column(norm_map, ["社員ID", "社員番号", "社員No", "id", "employeeid", "empid"])
+    title_key = _pick_column(norm_map, ["役職", "職種", "職位", "title", "job", "position"])
+    return dept_key, name_key, id_key, title_key
+
+
+# 1 つの Document に統合して取り込む社員名簿のファイル名
+_ROSTER_FILE_NAME = "社員名簿.csv"
+
+# 社員名簿の 1 行を整形する際の固定ラベル
+_LABEL_NAME = "氏名: "
+_LABEL_DEPT = "部署: "
+_LABEL_TITLE = "役職: "
+_LABEL_ID = "社員ID: "
+
+# BOM から一意に判別できる文字コード
+_CSV_BOMS = (
+    (codecs.BOM_UTF8, "utf-8-sig"),
+    (codecs.BOM_UTF16_LE, "utf-16"),
+    (codecs.BOM_UTF16_BE, "utf-16"),
+)
+
+
+def _decode_csv_bytes(raw: bytes, encodings: List[str]) -> Tuple[str, str]:
+    # BOM があればそれに従い、なければ候補の文字コードを順にデコードだけ試す（CSV の再パースはしない）
+    for bom, enc in _CSV_BOMS:
+        if raw.startswith(bom):
+            return raw.decode(enc), enc
     last_err = None
     for enc in encodings:
         try:
-            with open(file_path, "r", encoding=enc, newline="") as f:
-                reader = csv.DictReader(f)
-                fieldnames = [fn.strip() for fn in (reader.fieldnames or []) if fn is not None]
-                rows: List[Dict[str, str]] = []
-                for r in reader:
-                    row: Dict[str, str] = {}
-                    for k, v in (r or {}).items():
-                        if k is None:
-                            continue
-                        kk = str(k).strip()
-                        vv = "" if v is None else str(v).strip()
-                        row[kk] = vv
-                    rows.append(row)
-            return fieldnames, rows, enc
-        except Exception as e:
+            return raw.decode(enc), enc
+        except (UnicodeDecodeError, LookupError) as e:
             last_err = e
-            continue
-    raise last_err if last_err else RuntimeError("CSV read failed")
+    raise last_err if last_err else RuntimeError("CSV decode failed")
+
+
+def _iter_csv_rows(file_path: str, encodings: List[str]) -> tuple[List[str], Iterator[Dict[str, str]], str]:
+    # ファイルは 1 度だけバイト列で読み込み、文字コード判定とパースはメモリ上で行う
+    with open(file_path, "rb") as f:
+        raw = f.read()
+    text, enc = _decode_csv_bytes(raw, encodings)
+
+    reader = csv.reader(io.StringIO(text, newline=""))
+    # ヘッダーは 1 度だけ整形し、各行は位置で対応付ける（DictReader の行ごとの dict 生成を避ける）
+    # Unicode の表記揺れ（全角英数・合成/分解文字など）は取り込み時に 1 度だけ NFKC で吸収する
+    # 列名は intern しておき、キャッシュ済みの列推定結果（別の読み込み時の文字列）との照合も同一性比較で済ませる
+    fieldnames = [sys.intern(_nfkc(fn).strip()) for fn in next(reader, [])]
+    # 行は一括でリスト化せず、呼び出し側で整形しながら 1 行ずつ取り出す
+    rows = (
+        dict(zip(fieldnames, (_nfkc(v).strip() for v in r)))
+        for r in reader
+        if r  # DictReader と同様に空行は読み飛ばす
+    )
+    return fieldnames, rows, enc
 
 
 class EmployeeRosterCSVLoader:
@@ -82,44 +162,59 @@ class EmployeeRosterCSVLoader:
     def load(self):
         base = os.path.basename(self.file_path)
         # 特定ファイル以外は従来ローダーを使用（影響範囲を最小化）
-        if base.lower() != "社員名簿.csv":
-            return CSVLoader(self.file_path, encoding=self.encoding).load()
+        # 通常のファイル名は完全一致で判定し、拡張子の大文字・小文字違いのみ lower() で吸収する
+        if base != _ROSTER_FILE_NAME and base.lower() != _ROSTER_FILE_NAME:
+            return _csv_loader(self.file_path, encoding=self.encoding).load()
+
+        # 空ファイルは統合する行がなく、従来ローダーでも Document は生成されないため読み込みを省略
+        if os.path.getsize(self.file_path) == 0:
+            return []
 
         # 文字コードの揺れに耐える
         encodings = [self.encoding, "utf-8-sig", "cp932", "shift_jis", "utf-16"]
         try:
-            fieldnames, rows, used_enc = _read_csv_rows(self.file_path, encodings)
+            fieldnames, rows, used_enc = _iter_csv_rows(self.file_path, encodings)
         except Exception:
             # 最後の手段：従来ローダー
-            return CSVLoader(self.file_path, encoding=self.encoding).load()
+            return _csv_loader(self.file_path, encoding=self.encoding).load()
 
         if Document is None:
             # Document が import できない環境ではフォールバック
-            return CSVLoader(self.file_path, encoding=used_enc).load()
+            return _csv_loader(self.file_path, encoding=used_enc).load()
 
         # 列推定（よくある表記揺れに対応）
-        dept_key = _pick_column(fieldnames, ["所属部署", "部署", "部門", "所属", "department", "dept", "section", "team"])
-        name_key = _pick_column(fieldnames, ["氏名", "名前", "社員名", "name", "fullname"])
-        id_key = _pick_column(fieldnames, ["社員ID", "社員番号", "社員No", "id", "employeeid", "empid"])
-        title_key = _pick_column(fieldnames, ["役職", "職種", "職位", "title", "job", "position"])
+        dept_key, name_key, id_key, title_key = _resolve_keys(tuple(fieldnames))
 
-        used_keys = [k for k in [name_key, dept_key, title_key, id_key] if k]
+        used_keys = {k for k in (name_key, dept_key, title_key, id_key) if k}
+        # 追加情報の候補列は行ごとではなく 1 度だけ求める
+        extra_keys = tuple(k for k in fieldnames if k not in used_keys)
 
         def fmt_row(r: Dict[str, str]) -> str:
             parts: List[str] = []
-            if name_key and r.get(name_key):
-                parts.append(f"氏名: {r.get(name_key)}")
-            if dept_key and r.get(dept_key):
-                parts.append(f"部署: {r.get(dept_key)}")
-            if title_key and r.get(title_key):
-                parts.append(f"役職: {r.get(title_key)}")
-            if id_key and r.get(id_key):
-                parts.append(f"社員ID: {r.get(id_key)}")
+            # 固定ラベルは f-string を使わず文字列連結で組み立てる
+            # （列推定結果は None のほか、名前のない列の "" になり得るため、キー自体の真偽も確認する）
+            v = r.get(name_key) if name_key else None
+            if v:
+                parts.append(_LABEL_NAME + v)
+            v = r.get(dept_key) if dept_key else None
+            if v:
+                parts.append(_LABEL_DEPT + v)
+            v = r.get(title_key) if title_key else None
+            if v:
+                parts.append(_LABEL_TITLE + v)
+            v = r.get(id_key) if id_key else None
+            if v:
+                parts.append(_LABEL_ID + v)
 
             # 追加情報（長くなりすぎないように最大 3 項目）
-            extras = [k for k in fieldnames if k not in used_keys and r.get(k)]
-            for k in extras[:3]:
-                parts.append(f"{k}: {r.get(k)}")
+            n_extras = 0
+            for k in extra_keys:
+                v = r.get(k)
+                if v:
+                    parts.append(f"{k}: {v}")
+                    n_extras += 1
+                    if n_extras == 3:
+                        break
 
             # 何も取れない場合は行全体を簡易表現
             if not parts:
@@ -128,45 +223,52 @@ class EmployeeRosterCSVLoader:
             return " / ".join(parts)
 
         # 部署ごとにまとめる（人事部を先頭に置くことで該当検索の再現性を上げる）
-        groups: Dict[str, List[Dict[str, str]]] = {}
-        if dept_key:
+        # CSV の読み取りと 1 行の整形を同じループで行い、行データ（dict）は保持しない
+        groups: Dict[str, List[str]] = defaultdict(list)
+        if not dept_key:
+            groups["全社員"] = []
+        row_count = 0
+        try:
             for r in rows:
-                dept = (r.get(dept_key, "") or "").strip() or "未設定"
-                groups.setdefault(dept, []).append(r)
-        else:
-            groups["全社員"] = rows
-
-        def dept_sort_key(d: str):
-            # 人事系を最優先
-            if "人事" in d:
-                return (0, d)
-            return (1, d)
+                row_count += 1
+                dept = ((r.get(dept_key) or "").strip() or "未設定") if dept_key else "全社員"
+                lines = groups[dept]
+                line = fmt_row(r).strip()
+                if line:
+                    # 部署語を各行にも含め、埋め込みの手掛かりを強化
+                    if dept_key and "部署:" not in line:
+                        line = f"部署: {dept} / " + line
+                    lines.append(line)
+        except csv.Error:
+            # 途中で CSV として解釈できない行があった場合は従来ローダー
+            return _csv_loader(self.file_path, encoding=used_enc).load()
 
-        ordered_depts = sorted(groups.keys(), key=dept_sort_key)
+        # 人事系を最優先（比較キー関数は使わず、人事系とそれ以外に分けてから連結）
+        jinji_depts = sorted(d for d in groups if "人事" in d)
+        other_depts = sorted(d for d in groups if "人事" not in d)
+        ordered_depts = jinji_depts + other_depts
 
         # 検索に強い形にテキストを整形（部署見出し + 1行1名の正規化）
         header_cols = "、".join(fieldnames) if fieldnames else "（不明）"
-        content_lines: List[str] = []
-        content_lines.append("社員名簿（CSV）")
-        content_lines.append(f"ファイル: {base}")
-        content_lines.append(f"列: {header_cols}")
-        content_lines.append("")
-        content_lines.append("【部署別の社員一覧】")
-        content_lines.append("")
+        # 行ごとの list.append + join ではなく、StringIO に直接書き込んで中間文字列を減らす
+        buf = io.StringIO()
+        buf.write(
+            "社員名簿（CSV）\n"
+            f"ファイル: {base}\n"
+            f"列: {header_cols}\n"
+            "\n"
+            "【部署別の社員一覧】\n"
+            "\n"
+        )
 
         for dept in ordered_depts:
-            content_lines.append(f"### 部署: {dept}")
+            buf.write(f"### 部署: {dept}\n")
             # 1行1名で出力（同一部署の情報を近接させ、k=5でも複数名が拾われやすくする）
-            for r in groups[dept]:
-                line = fmt_row(r).strip()
-                if line:
-                    # 部署語を各行にも含め、埋め込みの手掛かりを強化
-                    if dept_key and "部署:" not in line:
-                        line = f"部署: {dept} / " + line
-                    content_lines.append(f"- {line}")
-            content_lines.append("")
+            for line in groups[dept]:
+                buf.write(f"- {line}\n")
+            buf.write("\n")
 
-        merged_text = "\n".join(content_lines).strip()
+        merged_text = buf.getvalue().strip()
 
         doc = Document(
             page_content=merged_text,
@@ -175,7 +277,7 @@ class EmployeeRosterCSVLoader:
                 "file_name": base,
                 "file_type": "csv",
                 "encoding": used_enc,
-                "row_count": len(rows),
+                "row_count": row_count,
             },
         )
         return [doc]
@@ -220,10 +322,10 @@ TEMPERATURE = 0.5
 # ==========================================
 RAG_TOP_FOLDER_PATH = "./data"
 SUPPORTED_EXTENSIONS = {
-    ".pdf": PyMuPDFLoader,
-    ".docx": Docx2txtLoader,
+    ".pdf": lambda path: _community_loader("PyMuPDFLoader")(path),
+    ".docx": lambda path: _community_loader("Docx2txtLoader")(path),
     ".csv": lambda path: EmployeeRosterCSVLoader(path, encoding="utf-8"),
-    ".txt": lambda path: TextLoader(path, encoding="utf-8"),
+    ".txt": lambda path: _community_loader("TextLoader")(path, encoding="utf-8"),
 }
 WEB_URL_LOAD_TARGETS = [
     "https://generative-ai.web-camp.io/"
@@ -292,5 +394,7 @@ RAG_RETRIEVER_K = 5
 RAG_CHUNK_SIZE = 500
 # チャンクの重なり（オーバーラップ）
 RAG_CHUNK_OVERLAP = 50
+# データソースのファイルを並列に読み込む際の最大スレッド数
+RAG_LOAD_MAX_WORKERS = min(32, (os.cpu_count() or 1) * 4)
 
 # Q6
\ No newline at end of file
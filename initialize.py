@@ -11,6 +11,7 @@ from logging.handlers import TimedRotatingFileHandler
 from uuid import uuid4
 import sys
 import unicodedata
+from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
 import streamlit as st
 from docx import Document
@@ -194,10 +195,12 @@ def load_data_sources():
     Returns:
         読み込んだ通常データソース
     """
-    # データソースを格納する用のリスト
-    docs_all = []
-    # ファイル読み込みの実行（渡した各リストにデータが格納される）
-    recursive_file_check(ct.RAG_TOP_FOLDER_PATH, docs_all)
+    # 読み込み対象のファイルパスを格納する用のリスト
+    file_paths = []
+    # 読み込み対象ファイルの洗い出し（渡したリストにファイルパスが格納される）
+    recursive_file_check(ct.RAG_TOP_FOLDER_PATH, file_paths)
+    # ファイル読み込みの実行
+    docs_all = load_files(file_paths)
 
     web_docs_all = []
     # ファイルとは別に、指定のWebページ内のデータも読み込み
@@ -214,48 +217,77 @@ def load_data_sources():
     return docs_all
 
 
-def recursive_file_check(path, docs_all):
+def recursive_file_check(path, file_paths):
     """
-    RAGの参照先となるデータソースの読み込み
+    RAGの参照先となるファイルパスの洗い出し
 
     Args:
         path: 読み込み対象のファイル/フォルダのパス
-        docs_all: データソースを格納する用のリスト
+        file_paths: 読み込み対象のファイルパスを格納する用のリスト
+    """
+    # パスがファイルの場合、想定していたファイル形式のみ読み込み対象として追加
+    if not os.path.isdir(path):
+        if os.path.splitext(path)[1] in ct.SUPPORTED_EXTENSIONS:
+            file_paths.append(path)
+        return
+
+    # フォルダの場合、os.scandir でフォルダ内のファイル/フォルダを取得
+    # （DirEntry が種別情報を保持しているため、エントリごとの stat 呼び出しを省ける）
+    with os.scandir(path) as entries:
+        for entry in entries:
+            if entry.is_dir():
+                # フォルダの場合、再帰的にファイル洗い出しの関数を実行
+                recursive_file_check(entry.path, file_paths)
+            elif os.path.splitext(entry.name)[1] in ct.SUPPORTED_EXTENSIONS:
+                # 想定していたファイル形式の場合のみ読み込み対象として追加
+                file_paths.append(entry.path)
+
+
+def load_files(file_paths):
+    """
+    複数ファイルのデータを並列に読み込み
+
+    Args:
+        file_paths: ファイルパスのリスト
+
+    Returns:
+        読み込んだデータソース（file_paths の順序を保持）
     """
-    # パスがフォルダかどうかを確認
-    if os.path.isdir(path):
-        # フォルダの場合、フォルダ内のファイル/フォルダ名の一覧を取得
-        files = os.listdir(path)
-        # 各ファイル/フォルダに対して処理
-        for file in files:
-            # ファイル/フォルダ名だけでなく、フルパスを取得
-            full_path = os.path.join(path, file)
-            # フルパスを渡し、再帰的にファイル読み込みの関数を実行
-            recursive_file_check(full_path, docs_all)
-    else:
-        # パスがファイルの場合、ファイル読み込み
-        file_load(path, docs_all)
-
-
-def file_load(path, docs_all):
+    docs_all = []
+    # PyMuPDF はマルチスレッドに対応しておらず GIL も解放しないため、PDF はこのスレッドで順番に読み込む
+    # それ以外（docx/txt/csv）はファイルI/Oが中心のため、スレッドで並列に読み込む
+    with ThreadPoolExecutor(max_workers=ct.RAG_LOAD_MAX_WORKERS) as executor:
+        futures = {
+            path: executor.submit(file_load, path)
+            for path in file_paths
+            if os.path.splitext(path)[1] != ".pdf"
+        }
+        # 読み込み結果は file_paths の順に格納する
+        for path in file_paths:
+            if path in futures:
+                docs_all.extend(futures[path].result())
+            else:
+                docs_all.extend(file_load(path))
+
+    return docs_all
+
+
+def file_load(path):
     """
     ファイル内のデータ読み込み
 
     Args:
         path: ファイルパス
-        docs_all: データソースを格納する用のリスト
+
+    Returns:
+        読み込んだデータソース
     """
-    # ファイルの拡張子を取得
+    # ファイルの拡張子を取得（対象のファイル形式かどうかは recursive_file_check で確認済み）
     file_extension = os.path.splitext(path)[1]
-    # ファイル名（拡張子を含む）を取得
-    file_name = os.path.basename(path)
-
-    # 想定していたファイル形式の場合のみ読み込む
-    if file_extension in ct.SUPPORTED_EXTENSIONS:
-        # ファイルの拡張子に合ったdata loaderを使ってデータ読み込み
-        loader = ct.SUPPORTED_EXTENSIONS[file_extension](path)
-        docs = loader.load()
-        docs_all.extend(docs)
+
+    # ファイルの拡張子に合ったdata loaderを使ってデータ読み込み
+    loader = ct.SUPPORTED_EXTENSIONS[file_extension](path)
+    return loader.load()
 
 
 def adjust_string(s):